@@ -5,10 +5,13 @@ import requests
 import json
 import time
 import random
-import urllib3
 import datetime
 import sys
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+import sqlite3
+import re
+import difflib
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 # Load environment variables
 dotenv.load_dotenv(".env")
@@ -21,13 +24,88 @@ CLIENT_ACCESS_TOKEN = os.getenv("TWITTER_CLIENT_ACCESS_TOKEN") # Client
 CLIENT_ACCESS_TOKEN_SECRET = os.getenv("TWITTER_CLIENT_ACCESS_TOKEN_SECRET") # Client
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Storage
+REPLIED_TO_TWEETS_DB = "replied_to_tweets.db"
+REPLIED_TO_TWEETS_FILE = "replied_to_tweets.txt" # legacy store, imported into the database on first run
+STATE_FILE = "state.json" # bot state that should survive restarts
+
+# Scheduling
+GURU_TWEET_INTERVAL_HOURS = 8 # hours between top level guru tweets
+GURU_TWEET_INTERVAL_SECONDS = GURU_TWEET_INTERVAL_HOURS * 60 * 60
+POLL_INTERVAL_SECONDS = 60 * 10 # time between home timeline checks
+MIN_SLEEP_SECONDS = 30 # never sleep less than this between cycles
+REPLY_DELAY_SECONDS = (60, 240) # random time between replies
+
+# Duplicate detection
+RECENT_TWEETS_KEPT = 50 # how many of our own guru tweets to compare new ones against
+DUPLICATE_SIMILARITY = 0.9 # tweets at least this similar to a recent one are regenerated
+GURU_TWEET_MAX_ATTEMPTS = 3
+
+# Twitter
+BOT_SCREEN_NAME = "roboticHugo"
+TWEET_MAX_LENGTH = 280 # in twitter's weighted length, see tweet_length
+TWEET_URL_LENGTH = 23 # twitter counts every link as this long
+TWEET_URL_RE = re.compile(r"https?://\S+")
+# code points twitter counts as 1, everything else (emoji, CJK, ...) counts as 2
+TWEET_SINGLE_WEIGHT_RANGES = ((0x0000, 0x10FF), (0x2000, 0x200D), (0x2010, 0x201F), (0x2032, 0x2037))
+LAST_TWEET_LOOKUP_COUNT = 20 # own tweets to look through for the last top level one
+REPLY_SEARCH_LIMIT = 100 # replies to look through when checking if the bot already replied
+
+# OpenAI
+OPENAI_CHAT_COMPLETIONS_URL = "https://api.openai.com/v1/chat/completions"
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+OPENAI_MAX_TOKENS = 120 # a 280 character tweet is well under 100 tokens
+OPENAI_TIMEOUT_SECONDS = 30
+OPENAI_MAX_RETRIES = 2 # retries of 429s, 5xx and dropped connections
+OPENAI_RETRY_BACKOFF_SECONDS = 10 # first wait before retrying, doubled for every retry after
+
+# Prompts
+REPLY_PROMPT = """You are an exceptionally smart person, using twitter. Your fields of interest are AI, Blockchain, and software development in general. You generally have a cheery attitude on Twitter. Someone with the name of '{tweeter_name}' tweeted the following thing: \n<BEGIN TWEET>{text}<END TWEET>\nGenerate a snarky but supportive, intelligent response. Do not use hashtags. \n\n"""
+GURU_TWEET_PROMPT = """You are an exceptionally smart person, using twitter. You have {followers} followers and have written {tweet_count} tweets.
+Your fields of interest are AI, Blockchain, Software Development, Fullstack, Startups, Health, Fitness, and other stuff like that.
+Your tweets are often full of wisdom and short. You do not use hashtags.
+Generate a {adjective} tweet that you would post to your twitter account. Do not use Hashtags."""
+PARAGRAPH_BREAK_RE = re.compile(r"\n\s*\n")
+SANITIZE_STRIP_CHARS = ' \t\r\n"'
+GURU_TWEET_ADJECTIVES = ('insightful', 'smart', 'intelligent', 'novel', 'cool', 'happy', 'pessimistic', 'innovative', 'teaching', 'original')
+
+# Backoff on errors
+BACKOFF_FACTOR = float(os.getenv("BACKOFF_FACTOR", 2))
+BACKOFF_JITTER_SECONDS = 5
+ERROR_BACKOFF_BASE_SECONDS = 60 # first wait after the main loop fails
+ERROR_BACKOFF_CAP_SECONDS = 60 * 60
+
 # Authenticate to Twitter
 auth = tweepy.OAuthHandler(CONSUMER_KEY, CONSUMER_SECRET)
 # auth.set_access_token(ACCESS_TOKEN, ACCESS_TOKEN_SECRET) # main account
 auth.set_access_token(CLIENT_ACCESS_TOKEN, CLIENT_ACCESS_TOKEN_SECRET) # bot account
 
-# Create API object
-api = tweepy.API(auth)
+# Create API object, waiting out rate limits until twitter's reset time instead of failing
+api = tweepy.API(auth, wait_on_rate_limit=True)
+
+# Reuse one HTTP session for OpenAI so connections are kept alive between requests
+openai_session = requests.Session()
+openai_session.headers.update({
+    'Content-Type': 'application/json',
+    'Authorization': f'Bearer {OPENAI_API_KEY}',
+})
+
+
+class OpenAIRetry(Retry):
+    """Retry policy that also waits before the first retry, urllib3 retries the first one right away"""
+
+    def get_backoff_time(self):
+        """Returns the wait before the next retry, the history already holds the current failure so len(self.history) - 1 is that retry's index"""
+        return OPENAI_RETRY_BACKOFF_SECONDS * 2 ** (len(self.history) - 1)
+
+
+# retry transient failures with backoff, a rejected key or a bad request fails the same way every time so those aren't retried
+openai_session.mount("https://", HTTPAdapter(max_retries=OpenAIRetry(
+    total=OPENAI_MAX_RETRIES,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"POST"}),
+    raise_on_status=False,
+)))
 
 # # MAKE TEST TWEET
 # api.update_status("Hello World 🤖 - Testing Twitter API")
@@ -38,59 +116,67 @@ def generate_response(tweet):
 
     tweeter_name = tweet.user.name
     text = tweet.full_text
-    prompt = f"""You are an exceptionally smart person, using twitter. Your fields of interest are AI, Blockchain, and software development in general. You generally have a cheery attitude on Twitter. Someone with the name of '{tweeter_name}' tweeted the following thing: \n<BEGIN TWEET>{text}<END TWEET>\nGenerate a snarky but supportive, intelligent response. Do not use hashtags. \n\n"""
+    prompt = REPLY_PROMPT.format(tweeter_name=tweeter_name, text=text)
 
     # get OpenAI response
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {OPENAI_API_KEY}',
-    }
+    text = request_openai_completion(prompt)
+    text = sanitize_ai_response(text)
+    return text
+
+
+def request_openai_completion(prompt):
+    """Requests a chat completion for the prompt from OpenAI and returns its text, or an empty string if it was cut off"""
+
     json_data = {
-        'model': 'text-davinci-003',
-        'prompt': prompt,
-        'max_tokens': 200,
+        'model': OPENAI_MODEL,
+        'messages': [{'role': 'user', 'content': prompt}],
+        'max_tokens': OPENAI_MAX_TOKENS,
         'temperature': 1.0,
     }
-    response = requests.post('https://api.openai.com/v1/completions', headers=headers, json=json_data, verify=False)
+    # transient failures (429s, 5xx, dropped connections) are retried by the session's adapter
     try:
-        response_json = json.loads(response.text)
-    except Exception as e:
+        response = openai_session.post(OPENAI_CHAT_COMPLETIONS_URL, json=json_data, timeout=OPENAI_TIMEOUT_SECONDS)
+    except requests.RequestException as e:
         print(e)
         raise Exception("OpenAI API error")
 
-
-    try:
-        text = response_json['choices'][0]['text']
-        text = sanitize_ai_response(text)
-    except Exception as e:
-        print(e)
-        print(response_json)
+    # only successful responses need parsing, error bodies are just logged
+    if response.status_code != 200:
+        print(f"OpenAI returned {response.status_code}: {response.text}")
         raise Exception("OpenAI API error")
-    return text
+    choice = response.json()['choices'][0]
+
+    # a completion cut off by max_tokens ends mid sentence, return it as empty so callers reject it like any unusable text
+    if choice['finish_reason'] == 'length':
+        print(f"OpenAI response was cut off at {OPENAI_MAX_TOKENS} tokens: {choice['message']['content']}")
+        return ""
+    return choice['message']['content']
+
+
+def backoff(attempt, base, cap, factor=BACKOFF_FACTOR, jitter=BACKOFF_JITTER_SECONDS):
+    """Returns how many seconds to wait before retry number `attempt` (counting from 0)
+
+    Grows exponentially from `base` up to `cap`, plus some random jitter so retries don't line up
+    """
+    return min(cap, base * factor ** attempt) + random.uniform(0, jitter)
 
 
 def sanitize_ai_response(text):
     """Sanitize the AI response to remove any unwanted text"""
 
-    if "\n\n" in text:
-        text = text.split("\n\n")[1]
-
-    # if text starts with " and ends with ", remove the quotes
-    if text.startswith('"') and text.endswith('"'):
-        text = text[1:-1]
-    # check again
-    if text.startswith('"') and text.endswith('"'):
-        text = text[1:-1]
-    # remove starting or ending quotes
-    if text.startswith('"'):
-        text = text[1:]
-    if text.endswith('"'):
-        text = text[:-1]
-    
+    # the model sometimes introduces the text with a preamble like "Here's a tweet:", drop it
+    text = text.strip()
+    paragraphs = PARAGRAPH_BREAK_RE.split(text, maxsplit=1)
+    if len(paragraphs) == 2 and paragraphs[0].endswith(':'):
+        text = paragraphs[1]
+
+    # remove any wrapping quotes and whitespace, in whatever order they are nested
+    text = text.strip(SANITIZE_STRIP_CHARS)
+
     return text
 
 
-def is_tweet_valid(tweet):
+def is_tweet_valid(tweet, replied_db):
     """Checks if a tweet is valid to reply to.
     
     Rules to check:
@@ -100,78 +186,98 @@ def is_tweet_valid(tweet):
     - should not include a link, or image or any other media
     """
 
+    # cheap checks on the tweet itself come first, the database and the twitter search last
+
     # check if tweet is a top level tweet
     if tweet.in_reply_to_status_id is not None:
         return False
     # check if tweet is a retweet, quote tweet, or reply
-    if 'RT @' in tweet.full_text or tweet.is_quote_status:
-        return False
-    # check if tweet has been replied to already by the bot
-    if str(tweet.id) in get_replied_to_tweets():
-        return False
-    # check if tweet has a link, image, or any other media
-    if tweet.entities['urls'] or 'media' in tweet.entities:
+    if tweet.is_quote_status or 'RT @' in tweet.full_text:
         return False
     # exempt @roboticHugo tweets from being replied to
-    if tweet.user.screen_name == "roboticHugo":
+    if tweet.user.screen_name == BOT_SCREEN_NAME:
         return False
     # check tweet should have more than 20 characters
     if len(tweet.full_text) < 20:
         return False
+    # check if tweet has a link, image, or any other media
+    if tweet.entities['urls'] or 'media' in tweet.entities:
+        return False
+    # check if tweet has been replied to already by the bot
+    if has_replied_to_tweet(replied_db, tweet.id):
+        return False
     # check if any of the replies to the tweet are from the bot already (roboticHugo)
-    for reply in tweepy.Cursor(api.search_tweets, q=f"to:{tweet.user.screen_name}", since_id=tweet.id, tweet_mode="extended").items():
-        if reply.user.screen_name == "roboticHugo":
+    for reply in tweepy.Cursor(api.search_tweets, q=f"to:{tweet.user.screen_name}", since_id=tweet.id, tweet_mode="extended").items(REPLY_SEARCH_LIMIT):
+        if reply.user.screen_name == BOT_SCREEN_NAME:
             return False
 
     return True
 
 
-def get_replied_to_tweets():
-    """Loads the replied to tweets from the file"""
-    if os.path.exists("replied_to_tweets.txt"):
-        with open("replied_to_tweets.txt", "r") as f:
-            replied_to_tweets = f.read().splitlines()
-    else:
-        replied_to_tweets = []
-    return replied_to_tweets
+def open_replied_to_tweets_db():
+    """Opens the replied to tweets database, importing the legacy text file if the database is empty"""
+    db = sqlite3.connect(REPLIED_TO_TWEETS_DB)
+    db.execute("CREATE TABLE IF NOT EXISTS replied (id TEXT PRIMARY KEY)")
+    if db.execute("SELECT 1 FROM replied LIMIT 1").fetchone() is None and os.path.exists(REPLIED_TO_TWEETS_FILE):
+        with open(REPLIED_TO_TWEETS_FILE, "r") as f:
+            db.executemany("INSERT OR IGNORE INTO replied (id) VALUES (?)", [(line,) for line in f.read().splitlines() if line])
+        db.commit()
+    return db
+
 
+def has_replied_to_tweet(replied_db, tweet_id):
+    """Checks if a tweet id is in the replied to tweets database"""
+    return replied_db.execute("SELECT 1 FROM replied WHERE id = ?", (str(tweet_id),)).fetchone() is not None
 
-def add_replied_to_tweet(tweet_id):
-    """Adds a tweet id to a new line in the replied to tweets file"""
-    with open("replied_to_tweets.txt", "a") as f:
-        f.write(f"{tweet_id}\n")
+
+def add_replied_to_tweet(replied_db, tweet_id):
+    """Adds a tweet id to the replied to tweets database"""
+    replied_db.execute("INSERT OR IGNORE INTO replied (id) VALUES (?)", (str(tweet_id),))
+    replied_db.commit()
 
 
 def main():
     """Main Loop. Gets tweets and then replies to them
     
-        To not double reply, we keep track of the tweet ids we have replied to in a file
+        To not double reply, we keep track of the tweet ids we have replied to in a database
     """
+    state = load_state()
+    replied_db = open_replied_to_tweets_db()
+
     # check last time the bot made a top level tweet
-    last_tweet_time = api.user_timeline(screen_name="roboticHugo", count=1, tweet_mode="extended", exclude_replies=True)[0].created_at
-    hours_since = (datetime.datetime.now(tz=datetime.timezone.utc) - last_tweet_time).total_seconds() / 3600
-    if hours_since > 8:
+    # the schedule is kept as epoch seconds, so checking it is a plain number comparison
+    last_tweet_time = get_last_tweet_time(state)
+    if last_tweet_time is None:
+        next_guru_tweet_at = time.time()
+    else:
+        next_guru_tweet_at = last_tweet_time.timestamp() + GURU_TWEET_INTERVAL_SECONDS
+    if time.time() >= next_guru_tweet_at:
         # make a top level guru tweet
-        tweet = generate_guru_tweet()
-        status_tweet = api.update_status(tweet)
-        api.create_favorite(status_tweet.id)
-        print(f"Made top level tweet: https://twitter.com/roboticHugo/status/{status_tweet.id}")
+        next_guru_tweet_at = time.time() + GURU_TWEET_INTERVAL_SECONDS
+        try:
+            post_guru_tweet(state)
+        except Exception as e:
+            print(e)
+            print("Error, continuing...")
 
     # print to stderr
     print("Starting main loop...", file=sys.stderr)
 
-    minutes_passed = 0
+    error_count = 0
+    newest_seen_tweet_id = None
+    next_reply_time = time.monotonic()
     while True:
         try:
-            # get tweets
-            tweets = api.home_timeline(tweet_mode="extended", count=100)
+            # get tweets, letting twitter drop replies and tweets we've already seen
+            tweets = api.home_timeline(tweet_mode="extended", count=100, exclude_replies=True, since_id=newest_seen_tweet_id)
             invalid_tweet_count = 0
+            failed_tweet_ids = []
             print(f"Fetched {len(tweets)} tweets")
             for tweet in tweets:
 
                 # print(f"Checking tweet: {tweet.id}... (url: https://twitter.com/{tweet.user.screen_name}/status/{tweet.id})")
                 # check if tweet is valid
-                if not is_tweet_valid(tweet):
+                if not is_tweet_valid(tweet, replied_db):
                     invalid_tweet_count += 1
                     
                     if random.random() < 0.02: # small chance of liking the tweet
@@ -184,7 +290,7 @@ def main():
 
                 # have random 70% chance of not replying to tweet (to appease the twitter gods)
                 if random.random() < 0.7:
-                    add_replied_to_tweet(tweet.id)
+                    add_replied_to_tweet(replied_db, tweet.id)
 
                     # like the tweet some times regardless
                     if random.random() < 0.2:
@@ -205,83 +311,167 @@ def main():
                     print(f"{response}")
                     print(f"==================== End ====================")
 
+                    # don't spend a twitter call on a reply twitter would reject
+                    if not is_tweet_text_valid(response):
+                        print("Response is empty or too long to tweet, skipping...")
+                        failed_tweet_ids.append(tweet.id)
+                        continue
+
+                    # space replies out to avoid rate limiting, time spent checking tweets and generating counts towards the wait
+                    time_to_wait = next_reply_time - time.monotonic()
+                    if time_to_wait > 0:
+                        print(f"Waiting {int(time_to_wait)} seconds before replying...")
+                        time.sleep(time_to_wait)
+
                     # reply to tweet
                     response_tweet = api.update_status(response, in_reply_to_status_id=tweet.id, auto_populate_reply_metadata=True)
 
+                    # add tweet id to replied to tweets straight away, so a failing like below can't lead to a second reply
+                    add_replied_to_tweet(replied_db, tweet.id)
+
                     # like our own response tweet
                     api.create_favorite(response_tweet.id)
 
-                    # add tweet id to replied to tweets
-                    add_replied_to_tweet(tweet.id)
-
                     # like the tweet
                     api.create_favorite(tweet.id)
 
+                    # schedule the earliest time for the next reply
+                    next_reply_time = time.monotonic() + random.randint(*REPLY_DELAY_SECONDS)
+
                 except Exception as e:
                     print(e)
                     print("Error, continuing...")
+                    failed_tweet_ids.append(tweet.id)
                     continue
-
-                # wait random amount of time to avoid rate limiting (5 - 15 seconds)
-                time_to_wait = random.randint(60, 240)
-                print(f"Waiting {time_to_wait} seconds before checking for new tweets...")
-                time.sleep(time_to_wait)
             
-            # wait 5 minutes before checking for new tweets
             print(f"Checked {len(tweets)} tweets, {invalid_tweet_count} were invalid tweets. (Replies, retweets, or already replied to.)")
-            print("Waiting 10 minutes before checking for new tweets...\n")
-            time.sleep(60 * 10)
-            minutes_passed += 10
-
-            # if 8 hours have passed, make a dumb guru tweet
-            if minutes_passed >= 8 * 60:
-                minutes_passed = 0
+            # only skip past tweets next time up to the oldest one we failed to reply to, so that one gets retried
+            oldest_failed_tweet_id = min(failed_tweet_ids, default=None)
+            handled_tweet_ids = [tweet.id for tweet in tweets if oldest_failed_tweet_id is None or tweet.id < oldest_failed_tweet_id]
+            if handled_tweet_ids:
+                newest_seen_tweet_id = max(handled_tweet_ids)
+
+            # if enough time has passed, make a dumb guru tweet
+            now = time.time()
+            if now >= next_guru_tweet_at:
+                next_guru_tweet_at = now + GURU_TWEET_INTERVAL_SECONDS
                 try:
-                    tweet = generate_guru_tweet()
-                    status_tweet = api.update_status(tweet)
-                    api.create_favorite(status_tweet.id)
+                    post_guru_tweet(state)
                 except Exception as e:
                     print(e)
                     print("Error, continuing...")
-                    continue
+
+            # sleep until the next timeline check or the next guru tweet, whichever comes first
+            seconds_until_guru_tweet = next_guru_tweet_at - time.time()
+            sleep_for = max(MIN_SLEEP_SECONDS, min(POLL_INTERVAL_SECONDS, seconds_until_guru_tweet))
+            print(f"Waiting {int(sleep_for)} seconds before checking for new tweets...\n")
+            time.sleep(sleep_for)
+            error_count = 0
         except Exception as e:
             print(e)
-            print("Error, waiting 1 hour before trying again...")
-            time.sleep(60 * 60)
+            time_to_wait = backoff(error_count, base=ERROR_BACKOFF_BASE_SECONDS, cap=ERROR_BACKOFF_CAP_SECONDS)
+            error_count += 1
+            print(f"Error, waiting {int(time_to_wait)} seconds before trying again...")
+            time.sleep(time_to_wait)
             continue
         
 
+def post_guru_tweet(state):
+    """Generates a guru tweet, posts it as a top level tweet and likes it"""
+    recent_tweets = state.get("recent_tweets", [])
+    for attempt in range(GURU_TWEET_MAX_ATTEMPTS):
+        tweet = generate_guru_tweet()
+        if not is_tweet_text_valid(tweet):
+            print(f"Generated tweet is empty or too long, regenerating: {tweet}")
+        elif is_near_duplicate(tweet, recent_tweets):
+            print(f"Generated tweet is too similar to a recent one, regenerating: {tweet}")
+        else:
+            break
+    else:
+        raise Exception("Could not generate a usable tweet")
+
+    status_tweet = api.update_status(tweet)
+
+    # remember when and what we tweeted so a restart doesn't have to ask twitter
+    state["last_tweet_time"] = status_tweet.created_at.isoformat()
+    state["recent_tweets"] = (recent_tweets + [tweet])[-RECENT_TWEETS_KEPT:]
+    save_state(state)
+
+    api.create_favorite(status_tweet.id)
+    print(f"Made top level tweet: https://twitter.com/{BOT_SCREEN_NAME}/status/{status_tweet.id}")
+    return status_tweet
+
+
+def is_tweet_text_valid(text):
+    """Checks if a generated text can be posted as a tweet at all"""
+    return 0 < tweet_length(text) <= TWEET_MAX_LENGTH
+
+
+def tweet_length(text):
+    """Counts the length of a text the way twitter does
+
+    Links count as 23 and characters outside the single weight ranges (emoji, CJK) count as 2.
+    Emoji sequences are counted per code point, so this errs on the long side
+    """
+    url_count = len(TWEET_URL_RE.findall(text))
+    text = TWEET_URL_RE.sub("", text)
+    weighted_length = sum(1 if any(start <= ord(char) <= end for start, end in TWEET_SINGLE_WEIGHT_RANGES) else 2 for char in text)
+    return url_count * TWEET_URL_LENGTH + weighted_length
+
+
+def is_near_duplicate(text, recent_tweets):
+    """Checks if a tweet is nearly the same as any of the recent tweets"""
+    text = text.lower()
+    for recent_tweet in recent_tweets:
+        matcher = difflib.SequenceMatcher(None, text, recent_tweet.lower())
+        # the quick ratios are upper bounds of ratio, so most tweets are ruled out without the full comparison
+        if matcher.real_quick_ratio() >= DUPLICATE_SIMILARITY and matcher.quick_ratio() >= DUPLICATE_SIMILARITY and matcher.ratio() >= DUPLICATE_SIMILARITY:
+            return True
+    return False
+
+
+def get_last_tweet_time(state):
+    """Gets the time of the last top level tweet, from the saved state if known, otherwise from twitter
+
+    Returns None if there is no recent top level tweet
+    """
+    if state.get("last_tweet_time"):
+        return datetime.datetime.fromisoformat(state["last_tweet_time"])
+
+    # twitter drops replies and retweets after picking `count` tweets, so ask for a few to find a top level one
+    tweets = api.user_timeline(screen_name=BOT_SCREEN_NAME, count=LAST_TWEET_LOOKUP_COUNT, exclude_replies=True, include_rts=False, trim_user=True)
+    if not tweets:
+        return None
+    return tweets[0].created_at
+
+
+def load_state():
+    """Loads the saved bot state from the state file"""
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state):
+    """Saves the bot state to the state file, replacing it atomically so a crash can't leave it half written"""
+    tmp_file = f"{STATE_FILE}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_file, STATE_FILE)
+
+
 def generate_guru_tweet():
     """Generates a tweet to post to the twitter account"""
 
-    adjectives = ['insightful', 'smart', 'intelligent', 'novel', 'cool', 'happy', 'pessimistic', 'innovative', 'teaching', 'original']
-    prompt = f"""You are an exceptionally smart person, using twitter. You have {random.randint(500, 50000)} followers and have written {random.randint(100, 3000)} tweets.
-Your fields of interest are AI, Blockchain, Software Development, Fullstack, Startups, Health, Fitness, and other stuff like that.
-Your tweets are often full of wisdom and short. You do not use hashtags.
-Generate a {random.choice(adjectives)} tweet that you would post to your twitter account. Do not use Hashtags."""
+    prompt = GURU_TWEET_PROMPT.format(
+        followers=random.randint(500, 50000),
+        tweet_count=random.randint(100, 3000),
+        adjective=random.choice(GURU_TWEET_ADJECTIVES),
+    )
 
     # get OpenAI response
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {OPENAI_API_KEY}',
-    }
-    # get random seed
-    seed = random.randint(0, 1000000000)
-    json_data = {
-        'model': 'text-davinci-003',
-        'prompt': prompt,
-        'max_tokens': 300,
-        'temperature': 1.0,
-    }
-    response = requests.post('https://api.openai.com/v1/completions', headers=headers, json=json_data, verify=False)
-    try:
-        response_json = json.loads(response.text)
-    except Exception as e:
-        print(e)
-        raise Exception("OpenAI API error")
-
-
-    text = response_json['choices'][0]['text']
+    text = request_openai_completion(prompt)
     text = sanitize_ai_response(text)
     return text
 